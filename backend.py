@@ -38,7 +38,7 @@ class ChatBackend:
     - Allows for easy testing and modification
     """
     
-    def __init__(self):
+    def __init__(self, llm=None, monitoring: bool = True, verbose: bool = True):
         """
         Initialize the chat backend with all necessary components.
         
@@ -47,6 +47,11 @@ class ChatBackend:
         2. Sets up monitoring with Langfuse
         3. Initializes the LLM model
         4. Prepares available tools
+        
+        Args:
+            llm: Optional chat model to use instead of Gemini (e.g. a local stand-in)
+            monitoring: Whether to send traces to Langfuse
+            verbose: Whether the agent logs its reasoning to the console
         """
         # Load environment variables from config.env file
         # This keeps sensitive information like API keys out of the code
@@ -60,11 +65,12 @@ class ChatBackend:
         # This helps track usage, costs, and performance
         self.langfuse_public_key = os.getenv("LANGFUSE_PUBLIC_KEY")
         self.langfuse_secret_key = os.getenv("LANGFUSE_SECRET_KEY")
-        self.langfuse_handler = self._setup_langfuse()
+        self.langfuse_handler = self._setup_langfuse() if monitoring else None
         
         # Initialize the AI model
         # We use Google's Gemini model here, but this could be swapped for others
-        self.llm = self._setup_llm()
+        self.llm = llm if llm is not None else self._setup_llm()
+        self.verbose = verbose
         
         # Set up available tools the AI can use
         # Tools extend what the AI can do beyond just text generation
@@ -143,7 +149,7 @@ class ChatBackend:
             tools=self.tools,
             system_message=SYSTEM_PROMPT,  # Defines the AI's personality and behavior
             human_message=TOOLS_PROMPT,    # Instructions for how to use tools
-            verbose=True  # Enables detailed logging (helpful for debugging)
+            verbose=self.verbose  # Enables detailed logging (helpful for debugging)
         )
         
         # Create the executor that runs the agent
@@ -154,7 +160,7 @@ class ChatBackend:
             memory=memory,
             return_intermediate_steps=True,  # Shows tool usage in UI
             handle_parsing_errors=True,      # Gracefully handles AI mistakes
-            verbose=True                     # Detailed logging
+            verbose=self.verbose             # Detailed logging
         )
 
         return executor
@@ -180,7 +186,9 @@ class ChatBackend:
             Dict containing the AI response and intermediate steps
         """
         # Set up callbacks for monitoring and UI updates
-        callbacks = [self.langfuse_handler]
+        callbacks = []
+        if self.langfuse_handler:
+            callbacks.append(self.langfuse_handler)
         if streamlit_callback:
             callbacks.append(streamlit_callback)
         
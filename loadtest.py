@@ -0,0 +1,433 @@
+"""
+LXP - Advanced AI development Workshop: Chatbot load test
+
+Simulates many concurrent chat sessions end-to-end through ChatBackend, using
+local stand-ins for the LLM and for API-Sports, and reports throughput,
+latency percentiles, memory per session and the saturation point as JSON.
+
+Usage:
+    python loadtest.py --concurrency 1,2,4,8,16,32 --output loadtest_report.json
+"""
+
+import argparse
+import json
+import math
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
+
+from langchain.memory import ConversationBufferMemory
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+import tools
+from backend import ChatBackend
+
+# Realistic multi-turn football conversations.
+# Each turn is (user message, tool the assistant should call, tool input);
+# a tool of None means the assistant answers directly without any tool.
+FOOTBALL_CONVERSATIONS: List[List[Tuple[str, Optional[str], Optional[str]]]] = [
+    [
+        ("Hi! Can you help me follow the Premier League?", None, None),
+        ("What is the league ID of the Premier League?", "search_league", "Premier League"),
+        ("Show me the Premier League table for 2023", "league_standings", "39, 2023"),
+        ("Tell me about Arsenal", "search_team", "Arsenal"),
+        ("What were Arsenal's last results?", "last_results", "42"),
+    ],
+    [
+        ("Quel est le classement de la Ligue 1 2023 ?", "search_league", "Ligue 1"),
+        ("Et le classement complet pour la saison 2023 ?", "league_standings", "61, 2023"),
+        ("Donne-moi des infos sur le Paris Saint Germain", "search_team", "Paris Saint Germain"),
+        ("Quels sont les derniers résultats du PSG ?", "last_results", "85"),
+    ],
+    [
+        ("Tell me about Barcelona", "search_team", "Barcelona"),
+        ("How did Barcelona do in their last three games?", "last_results", "529"),
+        ("Which league do they play in?", "search_league", "La Liga"),
+        ("Who is top of La Liga in 2023?", "league_standings", "140, 2023"),
+        ("Thanks, that's all for today!", None, None),
+    ],
+    [
+        ("Find the Bundesliga for me", "search_league", "Bundesliga"),
+        ("Show the Bundesliga standings for 2023", "league_standings", "78, 2023"),
+        ("What about Bayern Munich's recent form?", "last_results", "157"),
+    ],
+]
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Local stand-in for the LLM that follows the scripted conversations.
+
+    It answers in the JSON format expected by ConversationalChatAgent: a tool call
+    on the first pass of a turn, then a final answer built from the tool response.
+    The model is stateless, so one instance can be shared by every session.
+    """
+
+    script: Dict[str, Tuple[Optional[str], Optional[str]]]
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-football"
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        # Simulate the time spent waiting for the real model
+        if self.latency:
+            time.sleep(self.latency)
+
+        last = messages[-1].content if messages else ""
+        if last.startswith("TOOL RESPONSE"):
+            # Second pass: summarise the first line of the tool response
+            observation = last.split("\n", 2)[2].split("\n\nUSER'S INPUT", 1)[0]
+            action = {"action": "Final Answer", "action_input": f"Here is what I found: {observation.splitlines()[0]}"}
+        else:
+            tool_name, tool_input = self._lookup(last)
+            if tool_name:
+                action = {"action": tool_name, "action_input": tool_input}
+            else:
+                action = {"action": "Final Answer", "action_input": "Happy to help with anything football related!"}
+
+        text = f"```json\n{json.dumps(action, ensure_ascii=False)}\n```"
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _lookup(self, prompt: str) -> Tuple[Optional[str], Optional[str]]:
+        # The user's input is the last thing in the tools prompt
+        prompt = prompt.rstrip()
+        for message, step in self.script.items():
+            if prompt.endswith(message):
+                return step
+        return None, None
+
+
+# Canned API-Sports payloads, shaped like the real responses used in tools.py
+_TEAM = {"id": 42, "name": "Arsenal", "country": "England", "code": "ARS", "founded": 1886,
+         "logo": "https://media.api-sports.io/football/teams/42.png"}
+_VENUE = {"name": "Emirates Stadium", "capacity": 60383, "surface": "grass"}
+_STANDING_ROW = {"rank": 1, "team": {"name": "Arsenal"}, "points": 89,
+                 "all": {"played": 38, "win": 28, "draw": 5, "lose": 5, "goals": {"for": 91, "against": 29}}}
+_FIXTURE = {"teams": {"home": {"name": "Arsenal"}, "away": {"name": "Everton"}},
+            "goals": {"home": 2, "away": 1},
+            "fixture": {"date": "2024-05-19T15:00:00+00:00"},
+            "league": {"name": "Premier League"}}
+
+API_SPORTS_RESPONSES = {
+    "/teams": {"response": [{"team": _TEAM, "venue": _VENUE}]},
+    "/leagues": {"response": [{"league": {"id": 39, "name": "Premier League"}, "country": {"name": "England"}}]},
+    "/standings": {"response": [{"league": {"standings": [[_STANDING_ROW] * 20]}}]},
+    "/fixtures": {"response": [_FIXTURE] * 3},
+}
+
+
+class _ApiSportsHandler(BaseHTTPRequestHandler):
+    """Serves the canned API-Sports payloads after a configurable delay."""
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        payload = API_SPORTS_RESPONSES.get(urlparse(self.path).path)
+        body = json.dumps(payload if payload is not None else {"response": []}).encode()
+        self.send_response(200 if payload is not None else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        # Keep the console readable during the run
+        pass
+
+
+class _ApiSportsServer(ThreadingHTTPServer):
+    # Accept bursts of connections from many sessions at once
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+def start_api_sports_stub(latency: float = 0.0) -> _ApiSportsServer:
+    """
+    Start a local stand-in for API-Sports and point tools.py at it.
+
+    Args:
+        latency: Seconds to wait before answering each request
+
+    Returns:
+        _ApiSportsServer: Running server (call shutdown() when done)
+    """
+    server = _ApiSportsServer(("127.0.0.1", 0), _ApiSportsHandler)
+    server.latency = latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    tools.API_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    if not tools.API_KEY:
+        tools.API_KEY = "loadtest"
+    return server
+
+
+def _deep_sizeof(obj, seen=None) -> int:
+    """Approximate the memory held by an object and everything it references."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += _deep_sizeof(vars(obj), seen)
+    return size
+
+
+def run_session(backend: ChatBackend,
+                conversation: List[Tuple[str, Optional[str], Optional[str]]]) -> Dict[str, Any]:
+    """
+    Replay one conversation in its own session, the same way frontend.py does.
+
+    Args:
+        backend: Shared backend instance
+        conversation: Scripted turns to send
+
+    Returns:
+        Dict with per-turn latencies, error count and session memory size
+    """
+    memory = ConversationBufferMemory(
+        return_messages=True,
+        memory_key="chat_history",
+        output_key="output"
+    )
+
+    latencies, errors = [], 0
+    for message, tool_name, _ in conversation:
+        start = time.perf_counter()
+        try:
+            executor = backend.create_agent_executor(memory)
+            response = backend.process_message(message, executor)
+
+            # A turn fails if there is no answer, the scripted tool was not used,
+            # or a tool reported an error
+            steps = response.get("intermediate_steps", [])
+            used = [action.tool for action, _ in steps]
+            if (not response.get("output")
+                    or (tool_name and tool_name not in used)
+                    or any(str(observation).startswith("Erreur") for _, observation in steps)):
+                errors += 1
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "latencies": latencies,
+        "errors": errors,
+        "memory_bytes": _deep_sizeof(memory.chat_memory.messages),
+    }
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of a non-empty list.
+
+    >>> [_percentile(list(range(1, 11)), pct) for pct in (50, 90, 95, 100)]
+    [5, 9, 10, 10]
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def run_stage(backend: ChatBackend, concurrency: int, sessions: int, trace_memory: bool) -> Dict[str, Any]:
+    """
+    Run a batch of sessions with a fixed number of them active at once.
+
+    Args:
+        backend: Shared backend instance
+        concurrency: Number of sessions running in parallel
+        sessions: Total number of sessions to run in this stage
+        trace_memory: Whether to measure peak Python heap usage with tracemalloc
+
+    Returns:
+        Dict with the stage metrics
+    """
+    conversations = [FOOTBALL_CONVERSATIONS[i % len(FOOTBALL_CONVERSATIONS)] for i in range(sessions)]
+
+    if trace_memory:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda conv: run_session(backend, conv), conversations))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for result in results for latency in result["latencies"]]
+    errors = sum(result["errors"] for result in results)
+    memory = [result["memory_bytes"] for result in results]
+
+    stage = {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "turns": len(latencies),
+        "errors": errors,
+        "error_rate": errors / len(latencies),
+        "duration_s": elapsed,
+        "throughput_turns_per_s": len(latencies) / elapsed,
+        "throughput_sessions_per_s": sessions / elapsed,
+        "latency_s": {
+            "mean": statistics.mean(latencies),
+            "p50": _percentile(latencies, 50),
+            "p90": _percentile(latencies, 90),
+            "p95": _percentile(latencies, 95),
+            "p99": _percentile(latencies, 99),
+            "max": max(latencies),
+        },
+        "memory_per_session_bytes": {
+            "history_mean": statistics.mean(memory),
+            "history_max": max(memory),
+        },
+    }
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        stage["memory_per_session_bytes"]["heap_peak"] = (peak - baseline) / concurrency
+    return stage
+
+
+def find_saturation(stages: List[Dict[str, Any]],
+                    min_gain: float,
+                    max_error_rate: float,
+                    latency_slo: Optional[float]) -> Optional[Dict[str, Any]]:
+    """
+    Find the first stage where adding concurrency stopped paying off.
+
+    A stage is saturated when its throughput improves by less than min_gain over
+    the best previous stage, its error rate exceeds max_error_rate, or its p95
+    latency exceeds latency_slo.
+
+    Returns:
+        Dict describing the saturation point, or None if it was not reached
+    """
+    best = None
+    for stage in stages:
+        reasons = []
+        if stage["error_rate"] > max_error_rate:
+            reasons.append(f"error rate {stage['error_rate']:.2%} > {max_error_rate:.2%}")
+        if latency_slo is not None and stage["latency_s"]["p95"] > latency_slo:
+            reasons.append(f"p95 latency {stage['latency_s']['p95']:.3f}s > {latency_slo}s")
+        if best and stage["throughput_turns_per_s"] < best["throughput_turns_per_s"] * (1 + min_gain):
+            reasons.append(f"throughput gain below {min_gain:.0%}")
+
+        if reasons:
+            return {
+                "max_healthy_concurrency": best["concurrency"] if best else None,
+                "max_healthy_throughput_turns_per_s": best["throughput_turns_per_s"] if best else None,
+                "saturated_at_concurrency": stage["concurrency"],
+                "reasons": reasons,
+            }
+        best = stage
+    return None
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse the command line options."""
+    parser = argparse.ArgumentParser(description="Load test the football chatbot backend.")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32",
+                        help="Comma-separated concurrency levels to ramp through (default: 1,2,4,8,16,32)")
+    parser.add_argument("--sessions-per-worker", type=int, default=3,
+                        help="Sessions each worker runs per stage (default: 3)")
+    parser.add_argument("--llm-latency", type=float, default=0.05,
+                        help="Seconds the LLM stand-in waits per call (default: 0.05)")
+    parser.add_argument("--api-latency", type=float, default=0.02,
+                        help="Seconds the API-Sports stand-in waits per request (default: 0.02)")
+    parser.add_argument("--saturation-gain", type=float, default=0.10,
+                        help="Minimum throughput gain between stages before calling it saturated (default: 0.10)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01,
+                        help="Error rate above which a stage is saturated (default: 0.01)")
+    parser.add_argument("--latency-slo", type=float, default=None,
+                        help="p95 turn latency in seconds above which a stage is saturated")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also measure peak heap increase per active session with tracemalloc (slows the run)")
+    parser.add_argument("--output", default=None,
+                        help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    # Reject bad values up front instead of failing halfway through the ramp
+    try:
+        args.concurrency = [int(level) for level in args.concurrency.split(",")]
+    except ValueError:
+        parser.error(f"--concurrency must be comma-separated integers, got '{args.concurrency}'")
+    if any(level < 1 for level in args.concurrency):
+        parser.error("--concurrency levels must all be at least 1")
+    if args.sessions_per_worker < 1:
+        parser.error("--sessions-per-worker must be at least 1")
+    return args
+
+
+def main(argv=None):
+    """
+    Ramp concurrency stage by stage and write a machine-readable report.
+    """
+    args = parse_args(argv)
+    levels = args.concurrency
+
+    # Local stand-ins so the run never touches Gemini, Langfuse or API-Sports
+    server = start_api_sports_stub(args.api_latency)
+    script = {message: (tool, tool_input)
+              for conversation in FOOTBALL_CONVERSATIONS
+              for message, tool, tool_input in conversation}
+    llm = ScriptedChatModel(script=script, latency=args.llm_latency)
+    backend = ChatBackend(llm=llm, monitoring=False, verbose=False)
+
+    # Untimed warm-up sessions, so one-time costs (lazy imports, LangChain caches,
+    # first HTTP connections) are not counted against the first stage
+    for conversation in FOOTBALL_CONVERSATIONS:
+        run_session(backend, conversation)
+
+    if args.trace_memory:
+        tracemalloc.start()
+
+    stages = []
+    try:
+        for concurrency in levels:
+            stage = run_stage(backend, concurrency, concurrency * args.sessions_per_worker, args.trace_memory)
+            stages.append(stage)
+            print(f"concurrency={concurrency:<4} "
+                  f"throughput={stage['throughput_turns_per_s']:.1f} turns/s "
+                  f"p95={stage['latency_s']['p95'] * 1000:.0f} ms "
+                  f"errors={stage['errors']}", file=sys.stderr)
+    finally:
+        server.shutdown()
+        if args.trace_memory:
+            tracemalloc.stop()
+
+    report = {
+        "config": {
+            "concurrency_levels": levels,
+            "sessions_per_worker": args.sessions_per_worker,
+            "llm_latency_s": args.llm_latency,
+            "api_latency_s": args.api_latency,
+            "saturation_gain": args.saturation_gain,
+            "max_error_rate": args.max_error_rate,
+            "latency_slo_s": args.latency_slo,
+        },
+        "stages": stages,
+        "saturation": find_saturation(stages, args.saturation_gain, args.max_error_rate, args.latency_slo),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()